@@ -4,10 +4,11 @@
 """Interface used by provider and requirer of the 5G UDR."""
 
 import logging
-from typing import Optional
+from typing import Dict, Mapping, Optional
 
 from ops.charm import CharmBase, CharmEvents, RelationChangedEvent
 from ops.framework import EventBase, EventSource, Handle, Object
+from ops.model import RelationDataContent
 
 # The unique Charmhub library identifier, never change it
 LIBID = "ea8425a6bb8642c3be3666a457964369"
@@ -17,11 +18,18 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 3
+LIBPATCH = 11
 
 
 logger = logging.getLogger(__name__)
 
+UDR_IPV4_ADDRESS_KEY = "udr_ipv4_address"
+UDR_FQDN_KEY = "udr_fqdn"
+UDR_PORT_KEY = "udr_port"
+UDR_API_VERSION_KEY = "udr_api_version"
+
+_UDR_INFORMATION_KEYS = (UDR_IPV4_ADDRESS_KEY, UDR_FQDN_KEY, UDR_PORT_KEY, UDR_API_VERSION_KEY)
+
 
 class UDRAvailableEvent(EventBase):
     """Charm event emitted when an UDR is available."""
@@ -43,19 +51,12 @@ class UDRAvailableEvent(EventBase):
 
     def snapshot(self) -> dict:
         """Returns snapshot."""
-        return {
-            "udr_ipv4_address": self.udr_ipv4_address,
-            "udr_fqdn": self.udr_fqdn,
-            "udr_port": self.udr_port,
-            "udr_api_version": self.udr_api_version,
-        }
+        return {key: getattr(self, key) for key in _UDR_INFORMATION_KEYS}
 
     def restore(self, snapshot: dict) -> None:
         """Restores snapshot."""
-        self.udr_ipv4_address = snapshot["udr_ipv4_address"]
-        self.udr_fqdn = snapshot["udr_fqdn"]
-        self.udr_port = snapshot["udr_port"]
-        self.udr_api_version = snapshot["udr_api_version"]
+        for key in _UDR_INFORMATION_KEYS:
+            setattr(self, key, snapshot[key])
 
 
 class FiveGUDRRequirerCharmEvents(CharmEvents):
@@ -92,94 +93,73 @@ class FiveGUDRRequires(Object):
             logger.warning("No remote application in relation: %s", self.relationship_name)
             return
         remote_app_relation_data = relation.data[relation.app]
-        if "udr_ipv4_address" not in remote_app_relation_data:
-            logger.info(
-                "No udr_ipv4_address in relation data - Not triggering udr_available event"
-            )
-            return
-        if "udr_fqdn" not in remote_app_relation_data:
-            logger.info("No udr_fqdn in relation data - Not triggering udr_available event")
-            return
-        if "udr_port" not in remote_app_relation_data:
-            logger.info("No udr_port in relation data - Not triggering udr_available event")
-            return
-        if "udr_api_version" not in remote_app_relation_data:
-            logger.info("No udr_api_version in relation data - Not triggering udr_available event")
+        missing_keys = [
+            key for key in _UDR_INFORMATION_KEYS if key not in remote_app_relation_data
+        ]
+        if missing_keys:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "No %s in relation data - Not triggering udr_available event",
+                    ", ".join(missing_keys),
+                )
             return
         self.on.udr_available.emit(
-            udr_ipv4_address=remote_app_relation_data["udr_ipv4_address"],
-            udr_fqdn=remote_app_relation_data["udr_fqdn"],
-            udr_port=remote_app_relation_data["udr_port"],
-            udr_api_version=remote_app_relation_data["udr_api_version"],
+            **{key: remote_app_relation_data[key] for key in _UDR_INFORMATION_KEYS}
         )
 
+    @property
+    def is_available(self) -> bool:
+        """Returns whether all UDR information is available in relation data."""
+        remote_app_relation_data = self._remote_app_relation_data
+        return all(remote_app_relation_data.get(key) for key in _UDR_INFORMATION_KEYS)
+
     @property
     def udr_ipv4_address_available(self) -> bool:
         """Returns whether udr address is available in relation data."""
-        if self.udr_ipv4_address:
-            return True
-        else:
-            return False
+        return bool(self._remote_app_relation_data.get(UDR_IPV4_ADDRESS_KEY))
 
     @property
     def udr_ipv4_address(self) -> Optional[str]:
         """Returns udr_ipv4_address from relation data."""
-        relation = self.model.get_relation(relation_name=self.relationship_name)
-        remote_app_relation_data = relation.data.get(relation.app)
-        if not remote_app_relation_data:
-            return None
-        return remote_app_relation_data.get("udr_ipv4_address", None)
+        return self._remote_app_relation_data.get(UDR_IPV4_ADDRESS_KEY, None)
 
     @property
     def udr_fqdn_available(self) -> bool:
         """Returns whether udr fqdn is available in relation data."""
-        if self.udr_fqdn:
-            return True
-        else:
-            return False
+        return bool(self._remote_app_relation_data.get(UDR_FQDN_KEY))
 
     @property
     def udr_fqdn(self) -> Optional[str]:
         """Returns udr_fqdn from relation data."""
-        relation = self.model.get_relation(relation_name=self.relationship_name)
-        remote_app_relation_data = relation.data.get(relation.app)
-        if not remote_app_relation_data:
-            return None
-        return remote_app_relation_data.get("udr_fqdn", None)
+        return self._remote_app_relation_data.get(UDR_FQDN_KEY, None)
 
     @property
     def udr_port_available(self) -> bool:
         """Returns whether udr port is available in relation data."""
-        if self.udr_port:
-            return True
-        else:
-            return False
+        return bool(self._remote_app_relation_data.get(UDR_PORT_KEY))
 
     @property
     def udr_port(self) -> Optional[str]:
         """Returns udr_port from relation data."""
-        relation = self.model.get_relation(relation_name=self.relationship_name)
-        remote_app_relation_data = relation.data.get(relation.app)
-        if not remote_app_relation_data:
-            return None
-        return remote_app_relation_data.get("udr_port", None)
+        return self._remote_app_relation_data.get(UDR_PORT_KEY, None)
 
     @property
     def udr_api_version_available(self) -> bool:
         """Returns whether udr api version is available in relation data."""
-        if self.udr_api_version:
-            return True
-        else:
-            return False
+        return bool(self._remote_app_relation_data.get(UDR_API_VERSION_KEY))
 
     @property
     def udr_api_version(self) -> Optional[str]:
         """Returns udr_api_version from relation data."""
-        relation = self.model.get_relation(relation_name=self.relationship_name)
-        remote_app_relation_data = relation.data.get(relation.app)
-        if not remote_app_relation_data:
-            return None
-        return remote_app_relation_data.get("udr_api_version", None)
+        return self._remote_app_relation_data.get(UDR_API_VERSION_KEY, None)
+
+    @property
+    def _remote_app_relation_data(self) -> Mapping[str, str]:
+        """Returns remote application relation data, empty if not yet available."""
+        relation = self.model.get_relation(self.relationship_name)
+        if not relation or not relation.app:
+            return {}
+        return relation.data.get(relation.app) or {}
 
 
 class FiveGUDRProvides(Object):
@@ -211,24 +191,17 @@ class FiveGUDRProvides(Object):
         Returns:
             None
         """
-        relation = self.model.get_relation(self.relationship_name, relation_id=relation_id)
+        relation = self.model.get_relation(self.relationship_name, relation_id)
         if not relation:
             raise RuntimeError(f"Relation {self.relationship_name} not created yet.")
-        if self.udr_data_is_set(
-            relation_id=relation_id,
-            udr_ipv4_address=udr_ipv4_address,
-            udr_fqdn=udr_fqdn,
-            udr_port=udr_port,
-            udr_api_version=udr_api_version,
-        ):
-            return
-        relation.data[self.charm.app].update(
-            {
-                "udr_ipv4_address": udr_ipv4_address,
-                "udr_fqdn": udr_fqdn,
-                "udr_port": udr_port,
-                "udr_api_version": udr_api_version,
-            }
+        self._update_relation_data_if_changed(
+            relation_data=relation.data[self.charm.app],
+            udr_information={
+                UDR_IPV4_ADDRESS_KEY: udr_ipv4_address,
+                UDR_FQDN_KEY: udr_fqdn,
+                UDR_PORT_KEY: udr_port,
+                UDR_API_VERSION_KEY: udr_api_version,
+            },
         )
 
     def udr_data_is_set(
@@ -240,19 +213,20 @@ class FiveGUDRProvides(Object):
         udr_port: str,
     ) -> bool:
         """Returns whether udr_address is set in relation data."""
-        relation = self.model.get_relation(self.relationship_name, relation_id=relation_id)
+        relation = self.model.get_relation(self.relationship_name, relation_id)
         if not relation:
             raise RuntimeError(f"Relation {self.relationship_name} not created yet.")
-        if relation.data[self.charm.app].get("udr_ipv4_address", None) != udr_ipv4_address:
+        relation_data = relation.data[self.charm.app]
+        if relation_data.get(UDR_IPV4_ADDRESS_KEY, None) != udr_ipv4_address:
             logger.info(f"udr_ipv4_address not set to {udr_ipv4_address} in relation data")
             return False
-        if relation.data[self.charm.app].get("udr_fqdn", None) != udr_fqdn:
+        if relation_data.get(UDR_FQDN_KEY, None) != udr_fqdn:
             logger.info(f"udr_fqdn not set to {udr_fqdn} in relation data")
             return False
-        if relation.data[self.charm.app].get("udr_port", None) != udr_port:
+        if relation_data.get(UDR_PORT_KEY, None) != udr_port:
             logger.info(f"udr_port not set to {udr_port} in relation data")
             return False
-        if relation.data[self.charm.app].get("udr_api_version", None) != udr_api_version:
+        if relation_data.get(UDR_API_VERSION_KEY, None) != udr_api_version:
             logger.info(f"udr_api_version not set to {udr_api_version} in relation data")
             return False
         return True
@@ -260,13 +234,44 @@ class FiveGUDRProvides(Object):
     def set_udr_information_for_all_relations(
         self, udr_ipv4_address: str, udr_fqdn: str, udr_port: str, udr_api_version: str
     ) -> None:
-        """Sets UDR information in relation data for all relations."""
-        relations = self.model.relations
-        for relation in relations[self.relationship_name]:
-            self.set_udr_information(
-                udr_ipv4_address=udr_ipv4_address,
-                udr_fqdn=udr_fqdn,
-                udr_port=udr_port,
-                udr_api_version=udr_api_version,
-                relation_id=relation.id,
+        """Sets UDR information in relation data for all relations.
+
+        Args:
+            udr_ipv4_address: UDR address
+            udr_fqdn: UDR FQDN
+            udr_port: UDR port
+            udr_api_version: UDR API version
+
+        Returns:
+            None
+        """
+        udr_information = {
+            UDR_IPV4_ADDRESS_KEY: udr_ipv4_address,
+            UDR_FQDN_KEY: udr_fqdn,
+            UDR_PORT_KEY: udr_port,
+            UDR_API_VERSION_KEY: udr_api_version,
+        }
+        for relation in self.model.relations[self.relationship_name]:
+            self._update_relation_data_if_changed(
+                relation_data=relation.data[self.charm.app],
+                udr_information=udr_information,
             )
+
+    @staticmethod
+    def _update_relation_data_if_changed(
+        relation_data: RelationDataContent, udr_information: Dict[str, str]
+    ) -> None:
+        """Writes UDR information to relation data only if any value differs.
+
+        Writing identical data would still send the requirer a relation-changed event.
+
+        Args:
+            relation_data: Application relation data to update
+            udr_information: UDR information keyed by relation data key
+
+        Returns:
+            None
+        """
+        if all(relation_data.get(key) == value for key, value in udr_information.items()):
+            return
+        relation_data.update(udr_information)
@@ -5,7 +5,10 @@
 """Charmed Operator for the OpenAirInterface 5G Core UDR component."""
 
 
+import functools
+import hashlib
 import logging
+from typing import TYPE_CHECKING, Dict
 
 from charms.data_platform_libs.v0.database_requires import (  # type: ignore[import]
     DatabaseRequires,
@@ -16,24 +19,48 @@ from charms.observability_libs.v1.kubernetes_service_patch import (  # type: ign
     KubernetesServicePatch,
     ServicePort,
 )
-from jinja2 import Environment, FileSystemLoader
-from ops.charm import CharmBase, ConfigChangedEvent
+from ops.charm import CharmBase
+from ops.framework import EventBase, StoredState
 from ops.main import main
-from ops.model import ActiveStatus, BlockedStatus, ModelError, WaitingStatus
+from ops.model import ActiveStatus, BlockedStatus, WaitingStatus
+
+if TYPE_CHECKING:
+    from jinja2 import Template
 
 logger = logging.getLogger(__name__)
 
 BASE_CONFIG_PATH = "/openair-udr/etc"
 CONFIG_FILE_NAME = "udr.conf"
 DATABASE_NAME = "oai_db"
+DATABASE_RELATION_NAME = "database"
+NRF_RELATION_NAME = "fiveg-nrf"
+UDR_RELATION_NAME = "fiveg-udr"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_udr_template() -> "Template":
+    """Returns the compiled config file template.
+
+    jinja2 is imported here rather than at module level so that hooks which never
+    render the config file do not pay for the import.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    jinja2_environment = Environment(
+        loader=FileSystemLoader("src/templates/"), auto_reload=False, cache_size=-1
+    )
+    return jinja2_environment.get_template(f"{CONFIG_FILE_NAME}.j2")
 
 
 class Oai5GUDROperatorCharm(CharmBase):
     """Charm the service."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         """Observes juju events."""
         super().__init__(*args)
+        self._stored.set_default(config_hash="")
         self._container_name = self._service_name = "udr"
         self._container = self.unit.get_container(self._container_name)
         self.service_patcher = KubernetesServicePatch(
@@ -53,14 +80,15 @@ class Oai5GUDROperatorCharm(CharmBase):
                 ),
             ],
         )
-        self.udr_provides = FiveGUDRProvides(self, "fiveg-udr")
-        self.nrf_requires = FiveGNRFRequires(self, "fiveg-nrf")
+        self.udr_provides = FiveGUDRProvides(self, UDR_RELATION_NAME)
+        self.nrf_requires = FiveGNRFRequires(self, NRF_RELATION_NAME)
         self.database = DatabaseRequires(
-            self, relation_name="database", database_name=DATABASE_NAME
+            self, relation_name=DATABASE_RELATION_NAME, database_name=DATABASE_NAME
         )
-        self.framework.observe(self.on.config_changed, self._on_config_changed)
-        self.framework.observe(self.on.fiveg_nrf_relation_changed, self._on_config_changed)
-        self.framework.observe(self.database.on.database_created, self._on_config_changed)
+        self.framework.observe(self.on.config_changed, self._reconcile)
+        self.framework.observe(self.on.udr_pebble_ready, self._reconcile)
+        self.framework.observe(self.on.fiveg_nrf_relation_changed, self._reconcile)
+        self.framework.observe(self.database.on.database_created, self._reconcile)
         self.framework.observe(
             self.on.fiveg_udr_relation_joined, self._on_fiveg_udr_relation_joined
         )
@@ -79,17 +107,20 @@ class Oai5GUDROperatorCharm(CharmBase):
             return
         self.udr_provides.set_udr_information(
             udr_ipv4_address="127.0.0.1",
-            udr_fqdn=f"{self.model.app.name}.{self.model.name}.svc.cluster.local",
+            udr_fqdn=self._udr_fqdn,
             udr_port=self._config_nudr_interface_port,
             udr_api_version=self._config_nudr_interface_api_version,
             relation_id=event.relation.id,
         )
 
-    def _on_config_changed(self, event: ConfigChangedEvent) -> None:
-        """Triggered on any change in configuration.
+    def _reconcile(self, event: EventBase) -> None:
+        """Brings the workload config file and Pebble layer in line with the charm state.
+
+        Pushes, replans and restarts only what changed, so it is safe to run on
+        every event that may affect the workload.
 
         Args:
-            event: Config Changed Event
+            event: Juju event
 
         Returns:
             None
@@ -112,8 +143,8 @@ class Oai5GUDROperatorCharm(CharmBase):
                 "Waiting for NRF IPv4 address to be available in relation data"
             )
             return
-        self._push_config()
-        self._update_pebble_layer()
+        config_file_changed = self._push_config()
+        self._update_pebble_layer(config_file_changed=config_file_changed)
         if self.unit.is_leader():
             self._set_udr_information_for_all_relations()
         self.unit.status = ActiveStatus()
@@ -121,66 +152,82 @@ class Oai5GUDROperatorCharm(CharmBase):
     def _set_udr_information_for_all_relations(self):
         self.udr_provides.set_udr_information_for_all_relations(
             udr_ipv4_address="127.0.0.1",
-            udr_fqdn=f"{self.model.app.name}.{self.model.name}.svc.cluster.local",
+            udr_fqdn=self._udr_fqdn,
             udr_port=self._config_nudr_interface_port,
             udr_api_version=self._config_nudr_interface_api_version,
         )
 
     @property
     def _database_relation_data_is_available(self) -> bool:
-        relation_data = self.database.fetch_relation_data()
-        if not relation_data:
-            return False
-        relation = self.model.get_relation(relation_name="database")
+        return {"username", "password", "endpoints"}.issubset(self._database_relation_data)
+
+    @property
+    def _database_relation_data(self) -> Dict[str, str]:
+        """Returns data from the database relation, empty if not yet available."""
+        relation = self.model.get_relation(DATABASE_RELATION_NAME)
         if not relation:
-            return False
-        if "username" not in relation_data[relation.id]:
-            return False
-        if "password" not in relation_data[relation.id]:
-            return False
-        if "endpoints" not in relation_data[relation.id]:
-            return False
-        return True
+            return {}
+        return self.database.fetch_relation_data().get(relation.id, {})
 
-    def _update_pebble_layer(self) -> None:
+    def _update_pebble_layer(self, config_file_changed: bool) -> None:
         """Updates pebble layer with new configuration.
 
+        Replanning restarts the service when its layer changed, starts it if it is stopped
+        and is a no-op otherwise. When only the config file changed, the service is
+        restarted instead, which also starts it if it is stopped.
+
+        Args:
+            config_file_changed: Whether a new config file was pushed.
+
         Returns:
             None
         """
+        pebble_layer_changed = self._pebble_layer_changed
         self._container.add_layer("udr", self._pebble_layer, combine=True)
-        self._container.replan()
-        self._container.restart(self._service_name)
+        if config_file_changed and not pebble_layer_changed:
+            self._container.restart(self._service_name)
+        else:
+            self._container.replan()
+
+    @property
+    def _pebble_layer_changed(self) -> bool:
+        """Check if the UDR service in the current Pebble plan differs from our layer."""
+        current_services = self._container.get_plan().to_dict().get("services", {})
+        return (
+            current_services.get(self._service_name)
+            != self._pebble_layer["services"][self._service_name]
+        )
 
     @property
     def _udr_service_started(self) -> bool:
         if not self._container.can_connect():
             return False
-        try:
-            service = self._container.get_service(self._service_name)
-        except ModelError:
-            return False
-        if not service.is_running():
+        service = self._container.get_services(self._service_name).get(self._service_name)
+        if not service or not service.is_running():
             return False
         return True
 
     @property
     def _nrf_relation_created(self) -> bool:
-        return self._relation_created("fiveg-nrf")
+        return self._relation_created(NRF_RELATION_NAME)
 
     @property
     def _database_relation_created(self) -> bool:
-        return self._relation_created("database")
+        return self._relation_created(DATABASE_RELATION_NAME)
 
     def _relation_created(self, relation_name: str) -> bool:
         if not self.model.get_relation(relation_name):
             return False
         return True
 
-    def _push_config(self) -> None:
-        jinja2_environment = Environment(loader=FileSystemLoader("src/templates/"))
-        template = jinja2_environment.get_template(f"{CONFIG_FILE_NAME}.j2")
-        content = template.render(
+    def _push_config(self) -> bool:
+        """Renders the config file and pushes it to the container if its content changed.
+
+        Returns:
+            bool: Whether a new config file was pushed.
+        """
+        database_relation_data = self._database_relation_data
+        content = _get_udr_template().render(
             instance=self._config_instance,
             pid_directory=self._config_pid_directory,
             udr_name=self._config_udr_name,
@@ -195,14 +242,19 @@ class Oai5GUDROperatorCharm(CharmBase):
             nrf_port=self.nrf_requires.nrf_port,
             nrf_api_version=self.nrf_requires.nrf_api_version,
             nrf_fqdn=self.nrf_requires.nrf_fqdn,
-            mysql_server=self._database_relation_server,
-            mysql_user=self._database_relation_user,
-            mysql_password=self._database_relation_password,
+            mysql_server=self._database_server(database_relation_data["endpoints"]),
+            mysql_user=database_relation_data["username"],
+            mysql_password=database_relation_data["password"],
             mysql_database=DATABASE_NAME,
         )
-
+        content_hash = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        if self._stored.config_hash == content_hash and self._config_file_is_pushed:
+            logger.info(f"Config file is unchanged, not pushing: {CONFIG_FILE_NAME}")
+            return False
         self._container.push(path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE_NAME}", source=content)
+        self._stored.config_hash = content_hash
         logger.info(f"Wrote file to container: {CONFIG_FILE_NAME}")
+        return True
 
     @property
     def _config_file_is_pushed(self) -> bool:
@@ -237,29 +289,10 @@ class Oai5GUDROperatorCharm(CharmBase):
     def _config_use_http2(self) -> str:
         return "no"
 
-    @property
-    def _database_relation_server(self) -> str:
-        relation_data = self.database.fetch_relation_data()
-        relation = self.model.get_relation(relation_name="database")
-        if not relation:
-            raise ValueError("Database relation is not created")
-        return relation_data[relation.id]["endpoints"].split(",")[0].split(":")[0]
-
-    @property
-    def _database_relation_user(self) -> str:
-        relation_data = self.database.fetch_relation_data()
-        relation = self.model.get_relation(relation_name="database")
-        if not relation:
-            raise ValueError("Database relation is not created")
-        return relation_data[relation.id]["username"]
-
-    @property
-    def _database_relation_password(self) -> str:
-        relation_data = self.database.fetch_relation_data()
-        relation = self.model.get_relation(relation_name="database")
-        if not relation:
-            raise ValueError("Database relation is not created")
-        return relation_data[relation.id]["password"]
+    @staticmethod
+    def _database_server(endpoints: str) -> str:
+        """Returns the host of the first endpoint in a comma-separated endpoints list."""
+        return endpoints.partition(",")[0].partition(":")[0]
 
     @property
     def _config_nudr_interface_name(self) -> str:
@@ -277,7 +310,11 @@ class Oai5GUDROperatorCharm(CharmBase):
     def _config_nudr_interface_api_version(self) -> str:
         return "v1"
 
-    @property
+    @functools.cached_property
+    def _udr_fqdn(self) -> str:
+        return f"{self.model.app.name}.{self.model.name}.svc.cluster.local"
+
+    @functools.cached_property
     def _pebble_layer(self) -> dict:
         """Return a dictionary representing a Pebble layer."""
         return {
@@ -1,160 +1,186 @@
 # Copyright 2022 Guillaume Belanger
 # See LICENSE file for licensing details.
 
+import pathlib
+import string
 import unittest
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 import ops.testing
-from ops.model import ActiveStatus
+from ops.model import ActiveStatus, RelationDataContent
 from ops.pebble import ServiceInfo, ServiceStartup, ServiceStatus
 from ops.testing import Harness
 
 from charm import Oai5GUDROperatorCharm
 
+METADATA = (pathlib.Path(__file__).parents[2] / "metadata.yaml").read_text()
 
-class TestCharm(unittest.TestCase):
-    @patch(
-        "charm.KubernetesServicePatch",
-        lambda charm, ports: None,
+EXPECTED_UDR_CONFIG_FILE_TEMPLATE = string.Template(
+    "UDR =\n"
+    "{\n"
+    "  INSTANCE_ID = 0;            # 0 is the default\n"
+    '  PID_DIRECTORY = "/var/run";   # /var/run is the default\n'
+    '  UDR_NAME = "oai-udr";\n\n\n'
+    "  SUPPORT_FEATURES:{\n"
+    '    USE_FQDN_DNS = "yes";    # Set to yes if UDR will relying on a DNS to resolve UDM\'s FQDN\n'  # noqa: E501, W505
+    '    REGISTER_NRF = "no";    # Set to yes if UDR resgisters to an NRF\n'
+    '    USE_HTTP2    = "no";       # Set to yes to enable HTTP2 for UDR server\n'
+    "    DATABASE     = \"MySQL\";             # Set to 'MySQL'/'Cassandra' to use MySQL/Cassandra\n  };\n\n"  # noqa: E501, W505
+    "  INTERFACES:\n"
+    "  {\n"
+    "    # NUDR Interface (SBI)\n"
+    "    NUDR:\n"
+    "    {\n"
+    '      INTERFACE_NAME = "eth0";\n'
+    '      IPV4_ADDRESS   = "read";\n'
+    "      PORT           = 80;         # Default value: 80\n"
+    "      HTTP2_PORT     = 8080;   # Default value: 443\n"
+    '      API_VERSION    = "v1";\n'
+    "    };\n"
+    "  };\n\n"
+    "  NRF:\n"
+    "  {\n"
+    '    IPV4_ADDRESS = "$nrf_ipv4_address";\n'
+    "    PORT         = $nrf_port;            # Default value: 80\n"
+    '    API_VERSION  = "$nrf_api_version";\n'
+    '    FQDN         = "$nrf_fqdn";\n'
+    "  };\n\n"
+    "  MYSQL:\n"
+    "  {\n"
+    "    # MySQL options\n"
+    '    MYSQL_SERVER = "$mysql_server";\n'
+    '    MYSQL_USER   = "$mysql_user";\n'
+    '    MYSQL_PASS   = "$mysql_password";\n'
+    '    MYSQL_DB     = "oai_db";\n'
+    "    DB_CONNECTION_TIMEOUT = 300;           # Reset the connection to the DB after expiring the timeout (in second)\n"  # noqa: E501, W505
+    "  };\n"
+    "};"
+)
+
+UDR_SERVICE_INFO = ServiceInfo(
+    name="udr",
+    current=ServiceStatus.ACTIVE,
+    startup=ServiceStartup.ENABLED,
+)
+EXPECTED_PEBBLE_PLAN = {
+    "services": {
+        "udr": {
+            "override": "replace",
+            "summary": "udr",
+            "command": "/bin/bash /openair-udr/bin/entrypoint.sh /openair-udr/bin/oai_udr -c /openair-udr/etc/udr.conf -o",  # noqa: E501
+            "startup": "enabled",
+        }
+    },
+}
+
+
+def _create_nrf_relation_with_valid_data(harness: Harness):
+    with harness.hooks_disabled():
+        relation_id = harness.add_relation("fiveg-nrf", "nrf")
+        harness.add_relation_unit(relation_id=relation_id, remote_unit_name="nrf/0")
+
+    nrf_ipv4_address = "1.2.3.4"
+    nrf_port = "81"
+    nrf_api_version = "v1"
+    nrf_fqdn = "nrf.example.com"
+    key_values = {
+        "nrf_ipv4_address": nrf_ipv4_address,
+        "nrf_port": nrf_port,
+        "nrf_fqdn": nrf_fqdn,
+        "nrf_api_version": nrf_api_version,
+    }
+    harness.update_relation_data(relation_id=relation_id, app_or_unit="nrf", key_values=key_values)
+    return nrf_ipv4_address, nrf_port, nrf_api_version, nrf_fqdn
+
+
+def _create_database_relation_with_valid_data(harness: Harness):
+    with harness.hooks_disabled():
+        relation_id = harness.add_relation(relation_name="database", remote_app="mysql")
+        harness.add_relation_unit(relation_id=relation_id, remote_unit_name="mysql/0")
+    username = "whatever username"
+    password = "whatever password"
+    endpoints = "whatever endpoint 1,whatever endpoint 2"
+    key_values = {
+        "username": username,
+        "password": password,
+        "endpoints": endpoints,
+    }
+    harness.update_relation_data(
+        relation_id=relation_id, app_or_unit="mysql", key_values=key_values
     )
-    def setUp(self):
+    return username, password, endpoints
+
+
+class TestCharm(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
         ops.testing.SIMULATE_CAN_CONNECT = True
+        cls._kubernetes_service_patch = patch(
+            "charm.KubernetesServicePatch",
+            lambda charm, ports: None,
+        )
+        cls._kubernetes_service_patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._kubernetes_service_patch.stop()
+        ops.testing.SIMULATE_CAN_CONNECT = False
+
+    def setUp(self):
         self.model_name = "whatever"
-        self.addCleanup(setattr, ops.testing, "SIMULATE_CAN_CONNECT", False)
-        self.harness = Harness(Oai5GUDROperatorCharm)
+        self.harness = Harness(Oai5GUDROperatorCharm, meta=METADATA)
         self.addCleanup(self.harness.cleanup)
         self.harness.set_model_name(name=self.model_name)
-        self.harness.begin()
-
-    def _create_nrf_relation_with_valid_data(self):
         self.harness.set_can_connect(container="udr", val=True)
-        relation_id = self.harness.add_relation("fiveg-nrf", "nrf")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="nrf/0")
-
-        nrf_ipv4_address = "1.2.3.4"
-        nrf_port = "81"
-        nrf_api_version = "v1"
-        nrf_fqdn = "nrf.example.com"
-        key_values = {
-            "nrf_ipv4_address": nrf_ipv4_address,
-            "nrf_port": nrf_port,
-            "nrf_fqdn": nrf_fqdn,
-            "nrf_api_version": nrf_api_version,
-        }
-        self.harness.update_relation_data(
-            relation_id=relation_id, app_or_unit="nrf", key_values=key_values
-        )
-        return nrf_ipv4_address, nrf_port, nrf_api_version, nrf_fqdn
-
-    def _create_database_relation_with_valid_data(self):
-        relation_id = self.harness.add_relation(relation_name="database", remote_app="mysql")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="mysql/0")
-        username = "whatever username"
-        password = "whatever password"
-        endpoints = "whatever endpoint 1,whatever endpoint 2"
-        key_values = {
-            "username": username,
-            "password": password,
-            "endpoints": endpoints,
-        }
-        self.harness.update_relation_data(
-            relation_id=relation_id, app_or_unit="mysql", key_values=key_values
-        )
-        return username, password, endpoints
+        self.container = self.harness.model.unit.get_container("udr")
+        self.container.make_dir("/openair-udr/etc", make_parents=True)
 
-    @patch("ops.model.Container.push")
     def test_given_nrf_relation_contains_nrf_info_when_nrf_relation_joined_then_config_file_is_pushed(  # noqa: E501
-        self, mock_push
+        self,
     ):
-        self.harness.set_can_connect(container="udr", val=True)
-
-        username, password, endpoints = self._create_database_relation_with_valid_data()
+        self.harness.begin()
+        username, password, endpoints = _create_database_relation_with_valid_data(self.harness)
         (
             nrf_ipv4_address,
             nrf_port,
             nrf_api_version,
             nrf_fqdn,
-        ) = self._create_nrf_relation_with_valid_data()
-
-        mock_push.assert_called_with(
-            path="/openair-udr/etc/udr.conf",
-            source="UDR =\n"
-            "{\n"
-            "  INSTANCE_ID = 0;            # 0 is the default\n"
-            '  PID_DIRECTORY = "/var/run";   # /var/run is the default\n'
-            '  UDR_NAME = "oai-udr";\n\n\n'
-            "  SUPPORT_FEATURES:{\n"
-            '    USE_FQDN_DNS = "yes";    # Set to yes if UDR will relying on a DNS to resolve UDM\'s FQDN\n'  # noqa: E501, W505
-            '    REGISTER_NRF = "no";    # Set to yes if UDR resgisters to an NRF\n'
-            '    USE_HTTP2    = "no";       # Set to yes to enable HTTP2 for UDR server\n'
-            "    DATABASE     = \"MySQL\";             # Set to 'MySQL'/'Cassandra' to use MySQL/Cassandra\n  };\n\n"  # noqa: E501, W505
-            "  INTERFACES:\n"
-            "  {\n"
-            "    # NUDR Interface (SBI)\n"
-            "    NUDR:\n"
-            "    {\n"
-            '      INTERFACE_NAME = "eth0";\n'
-            '      IPV4_ADDRESS   = "read";\n'
-            "      PORT           = 80;         # Default value: 80\n"
-            "      HTTP2_PORT     = 8080;   # Default value: 443\n"
-            '      API_VERSION    = "v1";\n'
-            "    };\n"
-            "  };\n\n"
-            "  NRF:\n"
-            "  {\n"
-            f'    IPV4_ADDRESS = "{ nrf_ipv4_address }";\n'
-            f"    PORT         = { nrf_port };            # Default value: 80\n"
-            f'    API_VERSION  = "{ nrf_api_version }";\n'
-            f'    FQDN         = "{ nrf_fqdn }";\n'
-            "  };\n\n"
-            "  MYSQL:\n"
-            "  {\n"
-            "    # MySQL options\n"
-            f'    MYSQL_SERVER = "{ endpoints.split(",")[0] }";\n'
-            f'    MYSQL_USER   = "{ username }";\n'
-            f'    MYSQL_PASS   = "{ password }";\n'
-            '    MYSQL_DB     = "oai_db";\n'
-            "    DB_CONNECTION_TIMEOUT = 300;           # Reset the connection to the DB after expiring the timeout (in second)\n"  # noqa: E501, W505
-            "  };\n"
-            "};",
+        ) = _create_nrf_relation_with_valid_data(self.harness)
+
+        self.assertEqual(
+            self.container.pull("/openair-udr/etc/udr.conf").read(),
+            EXPECTED_UDR_CONFIG_FILE_TEMPLATE.substitute(
+                nrf_ipv4_address=nrf_ipv4_address,
+                nrf_port=nrf_port,
+                nrf_api_version=nrf_api_version,
+                nrf_fqdn=nrf_fqdn,
+                mysql_server=endpoints.split(",")[0],
+                mysql_user=username,
+                mysql_password=password,
+            ),
         )
 
-    @patch("ops.model.Container.push")
     def test_given_nrf_and_db_relation_are_set_when_config_changed_then_pebble_plan_is_created(  # noqa: E501
-        self, _
+        self,
     ):
-        self._create_database_relation_with_valid_data()
-
-        self._create_nrf_relation_with_valid_data()
-
-        expected_plan = {
-            "services": {
-                "udr": {
-                    "override": "replace",
-                    "summary": "udr",
-                    "command": "/bin/bash /openair-udr/bin/entrypoint.sh /openair-udr/bin/oai_udr -c /openair-udr/etc/udr.conf -o",  # noqa: E501
-                    "startup": "enabled",
-                }
-            },
-        }
-        self.harness.container_pebble_ready("udr")
+        self.harness.begin()
+        _create_database_relation_with_valid_data(self.harness)
+
+        _create_nrf_relation_with_valid_data(self.harness)
+
         updated_plan = self.harness.get_container_pebble_plan("udr").to_dict()
-        self.assertEqual(expected_plan, updated_plan)
-        service = self.harness.model.unit.get_container("udr").get_service("udr")
+        self.assertDictEqual(EXPECTED_PEBBLE_PLAN, updated_plan)
+        service = self.container.get_service("udr")
         self.assertTrue(service.is_running())
         self.assertEqual(self.harness.model.unit.status, ActiveStatus())
 
-    @patch("ops.model.Container.get_service")
+    @patch("ops.model.Container.get_services")
     def test_given_unit_is_leader_when_nrf_relation_joined_then_udr_relation_data_is_set(
-        self, patch_get_service
+        self, patch_get_services
     ):
         self.harness.set_leader(True)
-        self.harness.set_can_connect(container="udr", val=True)
-        patch_get_service.return_value = ServiceInfo(
-            name="udr",
-            current=ServiceStatus.ACTIVE,
-            startup=ServiceStartup.ENABLED,
-        )
+        patch_get_services.return_value = {"udr": UDR_SERVICE_INFO}
+        self.harness.begin()
 
         relation_id = self.harness.add_relation(relation_name="fiveg-udr", remote_app="udm")
         self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="udm/0")
@@ -167,3 +193,161 @@ class TestCharm(unittest.TestCase):
         assert relation_data["udr_fqdn"] == f"oai-5g-udr.{self.model_name}.svc.cluster.local"
         assert relation_data["udr_port"] == "80"
         assert relation_data["udr_api_version"] == "v1"
+
+    def test_given_config_file_already_pushed_when_config_changed_then_config_file_is_not_pushed_again(  # noqa: E501
+        self,
+    ):
+        self.harness.begin()
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+
+        with patch("ops.model.Container.push") as mock_push:
+            self.harness.update_config({})
+
+        mock_push.assert_not_called()
+
+    def test_given_config_file_and_pebble_layer_unchanged_when_config_changed_then_service_is_not_restarted(  # noqa: E501
+        self,
+    ):
+        self.harness.begin()
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+
+        with patch("ops.model.Container.restart") as mock_restart:
+            self.harness.update_config({})
+
+        mock_restart.assert_not_called()
+
+    def test_given_config_file_changed_and_pebble_layer_unchanged_when_nrf_relation_changed_then_service_is_restarted(  # noqa: E501
+        self,
+    ):
+        self.harness.begin()
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+        nrf_relation = self.harness.model.get_relation("fiveg-nrf")
+
+        with patch("ops.model.Container.replan") as mock_replan, patch(
+            "ops.model.Container.restart"
+        ) as mock_restart:
+            self.harness.update_relation_data(
+                relation_id=nrf_relation.id,
+                app_or_unit="nrf",
+                key_values={"nrf_ipv4_address": "5.6.7.8"},
+            )
+
+        mock_restart.assert_called_once_with("udr")
+        mock_replan.assert_not_called()
+
+    def test_given_service_stopped_when_config_changed_then_service_is_started(self):
+        self.harness.begin()
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+        self.container.stop("udr")
+
+        self.harness.update_config({})
+
+        self.assertTrue(self.container.get_service("udr").is_running())
+
+    def test_given_relations_are_set_when_pebble_ready_then_config_file_is_pushed_and_pebble_plan_is_created(  # noqa: E501
+        self,
+    ):
+        self.harness.begin()
+        with self.harness.hooks_disabled():
+            username, password, endpoints = _create_database_relation_with_valid_data(self.harness)
+            (
+                nrf_ipv4_address,
+                nrf_port,
+                nrf_api_version,
+                nrf_fqdn,
+            ) = _create_nrf_relation_with_valid_data(self.harness)
+
+        self.harness.container_pebble_ready("udr")
+
+        self.assertEqual(
+            self.container.pull("/openair-udr/etc/udr.conf").read(),
+            EXPECTED_UDR_CONFIG_FILE_TEMPLATE.substitute(
+                nrf_ipv4_address=nrf_ipv4_address,
+                nrf_port=nrf_port,
+                nrf_api_version=nrf_api_version,
+                nrf_fqdn=nrf_fqdn,
+                mysql_server=endpoints.split(",")[0],
+                mysql_user=username,
+                mysql_password=password,
+            ),
+        )
+        updated_plan = self.harness.get_container_pebble_plan("udr").to_dict()
+        self.assertDictEqual(EXPECTED_PEBBLE_PLAN, updated_plan)
+        self.assertEqual(self.harness.model.unit.status, ActiveStatus())
+
+    def test_given_unit_is_leader_and_udr_relations_created_when_nrf_and_db_relations_are_set_then_udr_information_is_set_for_all_relations(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(True)
+        self.harness.begin()
+        with self.harness.hooks_disabled():
+            udr_relation_ids = [
+                self.harness.add_relation(relation_name="fiveg-udr", remote_app=remote_app)
+                for remote_app in ("udm-1", "udm-2")
+            ]
+
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+
+        for relation_id in udr_relation_ids:
+            relation_data = self.harness.get_relation_data(
+                relation_id=relation_id, app_or_unit=self.harness.model.app.name
+            )
+            self.assertEqual(
+                relation_data,
+                {
+                    "udr_ipv4_address": "127.0.0.1",
+                    "udr_fqdn": f"oai-5g-udr.{self.model_name}.svc.cluster.local",
+                    "udr_port": "80",
+                    "udr_api_version": "v1",
+                },
+            )
+
+    def test_given_udr_information_already_set_when_config_changed_then_relation_data_is_not_rewritten(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(True)
+        self.harness.begin()
+        with self.harness.hooks_disabled():
+            udr_relation_id = self.harness.add_relation(
+                relation_name="fiveg-udr", remote_app="udm"
+            )
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+        relation_data = self.harness.get_relation_data(
+            relation_id=udr_relation_id, app_or_unit=self.harness.model.app.name
+        )
+        self.assertEqual(relation_data["udr_port"], "80")
+
+        with patch.object(RelationDataContent, "update") as mock_update:
+            self.harness.update_config({})
+
+        mock_update.assert_not_called()
+
+    def test_given_udr_information_already_set_when_udr_port_changes_then_relation_data_is_updated(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(True)
+        self.harness.begin()
+        with self.harness.hooks_disabled():
+            udr_relation_id = self.harness.add_relation(
+                relation_name="fiveg-udr", remote_app="udm"
+            )
+        _create_database_relation_with_valid_data(self.harness)
+        _create_nrf_relation_with_valid_data(self.harness)
+
+        with patch(
+            "charm.Oai5GUDROperatorCharm._config_nudr_interface_port",
+            new_callable=PropertyMock,
+            return_value="81",
+        ):
+            self.harness.update_config({})
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=udr_relation_id, app_or_unit=self.harness.model.app.name
+        )
+        self.assertEqual(relation_data["udr_port"], "81")
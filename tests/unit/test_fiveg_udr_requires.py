@@ -0,0 +1,137 @@
+# Copyright 2022 Guillaume Belanger
+# See LICENSE file for licensing details.
+
+import unittest
+
+import ops.testing
+from charms.oai_5g_udr.v0.fiveg_udr import FiveGUDRRequires
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: udr-requirer
+requires:
+  fiveg-udr:
+    interface: fiveg-udr
+"""
+
+UDR_INFORMATION = {
+    "udr_ipv4_address": "1.2.3.4",
+    "udr_fqdn": "udr.example.com",
+    "udr_port": "80",
+    "udr_api_version": "v1",
+}
+
+
+class DummyFiveGUDRRequirerCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.udr_requires = FiveGUDRRequires(self, "fiveg-udr")
+        self.udr_available_events = []
+        self.framework.observe(self.udr_requires.on.udr_available, self._on_udr_available)
+
+    def _on_udr_available(self, event):
+        self.udr_available_events.append(event)
+
+
+class TestFiveGUDRRequires(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        ops.testing.SIMULATE_CAN_CONNECT = True
+
+    @classmethod
+    def tearDownClass(cls):
+        ops.testing.SIMULATE_CAN_CONNECT = False
+
+    def setUp(self):
+        self.harness = Harness(DummyFiveGUDRRequirerCharm, meta=METADATA)
+        self.addCleanup(self.harness.cleanup)
+        self.harness.begin()
+
+    def _create_udr_relation(self) -> int:
+        relation_id = self.harness.add_relation(relation_name="fiveg-udr", remote_app="udr")
+        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="udr/0")
+        return relation_id
+
+    def test_given_no_relation_when_udr_information_read_then_none_is_returned(self):
+        udr_requires = self.harness.charm.udr_requires
+
+        self.assertIsNone(udr_requires.udr_ipv4_address)
+        self.assertIsNone(udr_requires.udr_fqdn)
+        self.assertIsNone(udr_requires.udr_port)
+        self.assertIsNone(udr_requires.udr_api_version)
+
+    def test_given_udr_information_set_key_by_key_when_relation_changed_then_udr_available_is_emitted_once_after_last_key(  # noqa: E501
+        self,
+    ):
+        relation_id = self._create_udr_relation()
+
+        for key, value in UDR_INFORMATION.items():
+            self.assertEqual(self.harness.charm.udr_available_events, [])
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit="udr", key_values={key: value}
+            )
+
+        self.assertEqual(len(self.harness.charm.udr_available_events), 1)
+        event = self.harness.charm.udr_available_events[0]
+        self.assertEqual(event.udr_ipv4_address, "1.2.3.4")
+        self.assertEqual(event.udr_fqdn, "udr.example.com")
+        self.assertEqual(event.udr_port, "80")
+        self.assertEqual(event.udr_api_version, "v1")
+
+    def test_given_no_relation_when_availability_checked_then_udr_is_not_available(self):
+        udr_requires = self.harness.charm.udr_requires
+
+        self.assertFalse(udr_requires.is_available)
+        self.assertFalse(udr_requires.udr_ipv4_address_available)
+        self.assertFalse(udr_requires.udr_fqdn_available)
+        self.assertFalse(udr_requires.udr_port_available)
+        self.assertFalse(udr_requires.udr_api_version_available)
+
+    def test_given_partial_udr_information_when_availability_checked_then_udr_is_not_available(
+        self,
+    ):
+        relation_id = self._create_udr_relation()
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit="udr",
+            key_values={"udr_ipv4_address": "1.2.3.4", "udr_fqdn": "udr.example.com"},
+        )
+        udr_requires = self.harness.charm.udr_requires
+
+        self.assertFalse(udr_requires.is_available)
+        self.assertTrue(udr_requires.udr_ipv4_address_available)
+        self.assertTrue(udr_requires.udr_fqdn_available)
+        self.assertFalse(udr_requires.udr_port_available)
+        self.assertFalse(udr_requires.udr_api_version_available)
+
+    def test_given_all_udr_information_when_availability_checked_then_udr_is_available(self):
+        relation_id = self._create_udr_relation()
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit="udr", key_values=UDR_INFORMATION
+        )
+        udr_requires = self.harness.charm.udr_requires
+
+        self.assertTrue(udr_requires.is_available)
+        self.assertTrue(udr_requires.udr_ipv4_address_available)
+        self.assertTrue(udr_requires.udr_fqdn_available)
+        self.assertTrue(udr_requires.udr_port_available)
+        self.assertTrue(udr_requires.udr_api_version_available)
+
+    def test_given_partial_udr_information_when_relation_changed_then_missing_keys_are_logged_and_udr_available_is_not_emitted(  # noqa: E501
+        self,
+    ):
+        relation_id = self._create_udr_relation()
+
+        with self.assertLogs("charms.oai_5g_udr.v0.fiveg_udr", level="INFO") as logs:
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit="udr",
+                key_values={"udr_ipv4_address": "1.2.3.4", "udr_fqdn": "udr.example.com"},
+            )
+
+        self.assertIn(
+            "No udr_port, udr_api_version in relation data - Not triggering udr_available event",
+            logs.output[-1],
+        )
+        self.assertEqual(self.harness.charm.udr_available_events, [])